@@ -0,0 +1,10 @@
+import os
+
+
+STOP_WORDS = frozenset({'and', 'but', 'or', 'for', 'nor', 'yet', 'so', '.', ',', '!', '?'})
+
+SENTIMENT_MODEL = os.environ.get('SENTIMENT_MODEL', 'en-sentiment')
+SENTIMENT_MODEL_FAST = os.environ.get('SENTIMENT_MODEL_FAST', 'sentiment-fast')
+
+# Cast the classifier to FP16 when running on CUDA.
+USE_HALF_PRECISION = True
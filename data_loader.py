@@ -0,0 +1,89 @@
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import re
+
+from models import Product, Products
+
+
+def _map_rows_to_products(rows):
+    return [Product(name, DataLoader._strip_html(description)) for name, description in rows]
+
+
+class DataLoader():
+    HTML_TAG_PATTERN = re.compile('<[^>]*>')
+    PARALLEL_ROW_THRESHOLD = 10000
+    ROW_CHUNK_SIZE = 10000
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self._products = Products()
+
+    def load(self):
+        try:
+            import pyarrow.csv as pac
+        except ImportError:
+            self._load_with_pandas()
+            return
+        table = pac.read_csv(self.file_name,
+            read_options=pac.ReadOptions(block_size=8 << 20),
+            parse_options=pac.ParseOptions(newlines_in_values=True))
+        for name, description in zip(table.column('name'), table.column('description')):
+            self._products.append(Product(name.as_py(), self._strip_html(description.as_py())))
+
+    def _load_with_pandas(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            self._load_with_csv()
+            return
+        df = pd.read_csv(self.file_name, usecols=['name', 'description'], dtype=str,
+            engine='c', na_filter=False)
+        # Vectorised tag stripping over the whole column in one call.
+        descriptions = df['description'].str.replace(self.HTML_TAG_PATTERN, '', regex=True)
+        for name, description in zip(df['name'], descriptions):
+            self._products.append(Product(name, description))
+
+    def _load_with_csv(self):
+        with open(self.file_name) as csv_file:
+            csv_reader = csv.reader(csv_file, delimiter=',')
+            next(csv_reader, None)  # header
+            rows = list(csv_reader)
+        if len(rows) < self.PARALLEL_ROW_THRESHOLD:
+            for row in rows:
+                self._products.append(self._map_to_products(row))
+            return
+        chunks = [rows[i:i + self.ROW_CHUNK_SIZE]
+            for i in range(0, len(rows), self.ROW_CHUNK_SIZE)]
+        with ProcessPoolExecutor() as pool:
+            for products in pool.map(_map_rows_to_products, chunks):
+                self._products.extend(products)
+
+    def _get_products(self):
+        return self._products
+
+    def _map_to_products(self, row):
+        product, description = row
+        return Product(product, self._strip_html(description))
+
+    @classmethod
+    def _strip_html(cls, text):
+        # Single pass over the string instead of the backtracking '<.*?>' regex.
+        if '<' not in text:
+            return text
+        parts = []
+        pos = 0
+        while True:
+            start = text.find('<', pos)
+            if start == -1:
+                parts.append(text[pos:])
+                break
+            end = text.find('>', start + 1)
+            if end == -1:
+                # Unbalanced markup; the regex fallback keeps the old behaviour.
+                parts.append(cls.HTML_TAG_PATTERN.sub('', text[pos:]))
+                break
+            parts.append(text[pos:start])
+            pos = end + 1
+        return ''.join(parts)
+
+    products = property(_get_products)
@@ -1,92 +1,17 @@
-from flair.models import TextClassifier
-from flair.data import Sentence
-from operator import attrgetter
-import csv
-import re
+import argparse
 
+from data_loader import DataLoader
+from sentiment_stats import Statistics, SENTIMENT_MODEL, SENTIMENT_MODEL_FAST
 
-DATA_FILE_NAME = 'dataset-gymbeam-product-descriptions-eng.csv'
-
-
-class Product():
-    def __init__(self, name, description):
-        self.name = name
-        self.description = description
-        self.sentiment_value = ''
-        self.confidence = 0
-        self.tagged_string = ''
-
-
-class Products(list):
-    pass
-
-
-class Statistics():
-    ONE_WORD_CONJUNCTIONS = ('and', 'but', 'or', 'for', 'nor', 'yet', 'so', '.', ',', '!', '?')
-
-    def __init__(self, products):
-        self.products = products
-
-    def compute_sentiment(self):
-        classifier = TextClassifier.load('en-sentiment')
-        for p in self.products:
-            sentence = Sentence(p.description)
-            classifier.predict(sentence)
-            rating = sentence.to_dict()
-            p.sentiment_value = rating['labels'][0]['value']
-            p.confidence = rating['labels'][0]['confidence']
-            p.tagged_string = sentence.to_tagged_string()
 
-    def most_positive(self):
-        return max([p for p in self.products if p.sentiment_value == 'POSITIVE'], 
-            key=attrgetter("confidence"))
-
-    def most_negative(self):
-        return max([p for p in self.products if p.sentiment_value == 'NEGATIVE'], 
-            key=attrgetter("confidence"))
-
-    def most_used_words(self, cnt=10, stop_words=ONE_WORD_CONJUNCTIONS):
-        words = self._words_statistics(stop_words)
-        words = {k: v for k, v in sorted(words.items(), key=lambda item: item[1])}
-        words_items = list(words.items())
-        words_items = words_items[-min(cnt,len(words_items)):]
-        words_items.reverse()
-        return words_items
-
-    def _words_statistics(self, stop_words=ONE_WORD_CONJUNCTIONS):
-        word_statistics = {}
-        for p in self.products:
-            words = [w.lower() for w in p.tagged_string.split() if w.lower() not in stop_words]
-            for w in words:
-                if not w in word_statistics:
-                    word_statistics[w] = words.count(w)
-                else:
-                    word_statistics[w] = word_statistics[w] + words.count(w)
-        return word_statistics
-
-
-class DataLoader():
-    def __init__(self, file_name):
-        self.file_name = file_name
-        self._products = Products()
-
-    def load(self):
-        with open(self.file_name) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=',')
-            for row in csv_reader:
-                product = self._map_to_products(row)
-                self._products.append(product)
-
-    def _get_products(self):
-        return self._products
+DATA_FILE_NAME = 'dataset-gymbeam-product-descriptions-eng.csv'
 
-    def _map_to_products(self, row):
-        product, description = row
-        cleanr = re.compile('<.*?>')
-        description = re.sub(cleanr, '', description)
-        return Product(product, description)
 
-    products = property(_get_products)
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Sentiment statistics for product descriptions.')
+    parser.add_argument('--fast', action='store_true',
+        help='use the smaller/faster sentiment model instead of %s' % SENTIMENT_MODEL)
+    return parser.parse_args()
 
 
 def print_product(product):
@@ -98,11 +23,13 @@ def print_product(product):
 
 
 if __name__ == "__main__":
+    args = parse_arguments()
+
     data_loader = DataLoader(DATA_FILE_NAME)
     data_loader.load()
 
     statistics = Statistics(data_loader.products)
-    statistics.compute_sentiment()
+    statistics.compute_sentiment(SENTIMENT_MODEL_FAST if args.fast else SENTIMENT_MODEL)
 
     max_positive = statistics.most_positive()
     max_negative = statistics.most_negative()
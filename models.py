@@ -0,0 +1,15 @@
+class Product():
+    __slots__ = ('name', 'description', 'sentiment_value', 'confidence', 'tagged_string',
+        '_tokens')
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.sentiment_value = ''
+        self.confidence = 0
+        self.tagged_string = ''
+        self._tokens = None
+
+
+class Products(list):
+    pass
@@ -0,0 +1,301 @@
+from flair.models import TextClassifier
+from flair.data import Sentence
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import heapq
+import os
+import re
+import sys
+import threading
+
+from config import STOP_WORDS, USE_HALF_PRECISION, SENTIMENT_MODEL, SENTIMENT_MODEL_FAST
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z']*")
+
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+
+def _tokenize(text):
+    # One C-level pass that both splits and drops punctuation, so "great!"
+    # and "great" count as the same word. Interning collapses the many
+    # repeats of common words into one string object apiece.
+    return [sys.intern(t) for t in _TOKEN_PATTERN.findall(text.lower())]
+
+
+_worker_classifier = None
+
+
+def _init_predict_worker(model_name):
+    global _worker_classifier
+    _worker_classifier = TextClassifier.load(model_name)
+    _worker_classifier.eval()
+
+
+def _predict_descriptions(descriptions, mini_batch_size):
+    import torch
+    # Sort by length within the chunk so mini-batches pad to similar sizes,
+    # mirroring the single-process path.
+    order = sorted(range(len(descriptions)), key=lambda i: len(descriptions[i]))
+    sentences = [Sentence(d) for d in descriptions]
+    with torch.inference_mode():
+        _worker_classifier.predict([sentences[i] for i in order],
+            mini_batch_size=mini_batch_size, embedding_storage_mode='none')
+    return [(s.labels[0].value, s.labels[0].score) if s.labels else ('UNKNOWN', 0)
+        for s in sentences]
+
+
+def _get_classifier(model_name):
+    classifier = _classifiers.get(model_name)
+    if classifier is None:
+        with _classifiers_lock:
+            classifier = _classifiers.get(model_name)
+            if classifier is None:
+                classifier = TextClassifier.load(model_name)
+                _classifiers[model_name] = classifier
+    return classifier
+
+
+LABEL_CODES = {'POSITIVE': 1, 'NEGATIVE': -1}  # anything else counts as UNKNOWN (0)
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_token_ids(token_ids, stop_mask, vocab_size):
+        counts = np.zeros(vocab_size, np.int64)
+        for i in range(token_ids.shape[0]):
+            token_id = token_ids[i]
+            if not stop_mask[token_id]:
+                counts[token_id] += 1
+        return counts
+
+
+class Statistics():
+    ONE_WORD_CONJUNCTIONS = STOP_WORDS
+    MINI_BATCH_SIZE = 32
+    PREDICT_CHUNK_SIZE = 1000
+    NUMPY_TOP_K_THRESHOLD = 100000
+    SKETCH_TABLE_SIZE = 1 << 20
+    SKETCH_HEAVY_THRESHOLD = 8
+
+    def __init__(self, products, mini_batch_size=MINI_BATCH_SIZE):
+        self.products = products
+        self.mini_batch_size = mini_batch_size
+        self._extremes_cache = None
+        self._words_cache = {}
+        self._sentiment_codes = None
+        self._confidences = None
+
+    def compute_sentiment(self, model_name=SENTIMENT_MODEL):
+        workers = self._predict_workers()
+        if workers > 1:
+            self._predict_in_processes(model_name, workers)
+        else:
+            self._predict_in_process(model_name)
+        self._extremes_cache = None
+        self._words_cache = {}
+        if np is not None:
+            self._sentiment_codes = np.fromiter(
+                (LABEL_CODES.get(p.sentiment_value, 0) for p in self.products),
+                dtype=np.int8, count=len(self.products))
+            self._confidences = np.fromiter((p.confidence for p in self.products),
+                dtype=np.float32, count=len(self.products))
+
+    @staticmethod
+    def _predict_workers():
+        import torch
+        if torch.cuda.is_available():
+            return 1  # several workers sharing one GPU would only contend
+        workers = int(os.environ.get('SENTIMENT_WORKERS', '1'))
+        return max(1, min(workers, os.cpu_count() or 1))
+
+    def _predict_in_processes(self, model_name, workers):
+        if not self.products:
+            return
+        chunk_size = -(-len(self.products) // workers)
+        chunks = [[p.description for p in self.products[i:i + chunk_size]]
+            for i in range(0, len(self.products), chunk_size)]
+        predict = partial(_predict_descriptions, mini_batch_size=self.mini_batch_size)
+        results = []
+        with ProcessPoolExecutor(max_workers=workers,
+                initializer=_init_predict_worker, initargs=(model_name,)) as pool:
+            for chunk_results in pool.map(predict, chunks):
+                results.extend(chunk_results)
+        for p, (sentiment_value, confidence) in zip(self.products, results):
+            p.sentiment_value = sentiment_value
+            p.confidence = confidence
+            p._tokens = _tokenize(p.description)
+
+    def _predict_in_process(self, model_name):
+        import flair
+        import torch
+        flair.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        classifier = _get_classifier(model_name)
+        classifier = classifier.to(flair.device)
+        classifier.eval()
+        if flair.device.type == 'cuda' and USE_HALF_PRECISION:
+            classifier = classifier.half()
+        # Sort by description length so each mini-batch pads to similar lengths.
+        order = sorted(range(len(self.products)), key=lambda i: len(self.products[i].description))
+        sentences = [Sentence(p.description) for p in self.products]
+        sorted_sentences = [sentences[i] for i in order]
+        with torch.inference_mode():
+            for start in range(0, len(sorted_sentences), self.PREDICT_CHUNK_SIZE):
+                chunk = sorted_sentences[start:start + self.PREDICT_CHUNK_SIZE]
+                classifier.predict(chunk, mini_batch_size=self.mini_batch_size, verbose=True,
+                    embedding_storage_mode='none')
+        for p, sentence in zip(self.products, sentences):
+            try:
+                if sentence.labels:
+                    label = sentence.labels[0]
+                    p.sentiment_value = label.value
+                    p.confidence = label.score
+                else:
+                    p.sentiment_value = 'UNKNOWN'
+                    p.confidence = 0
+                p._tokens = _tokenize(p.description)
+            except Exception:
+                p.sentiment_value = 'UNKNOWN'
+                p.confidence = 0
+
+    def most_positive(self):
+        best_positive = self._extremes()[0]
+        if best_positive is None:
+            raise ValueError('no product with POSITIVE sentiment')
+        return best_positive
+
+    def most_negative(self):
+        best_negative = self._extremes()[1]
+        if best_negative is None:
+            raise ValueError('no product with NEGATIVE sentiment')
+        return best_negative
+
+    def _extremes(self):
+        if self._extremes_cache is None:
+            if self._sentiment_codes is not None:
+                self._extremes_cache = (self._best_for(LABEL_CODES['POSITIVE']),
+                    self._best_for(LABEL_CODES['NEGATIVE']))
+            else:
+                best_positive = None
+                best_negative = None
+                for p in self.products:
+                    if p.sentiment_value == 'POSITIVE':
+                        if best_positive is None or p.confidence > best_positive.confidence:
+                            best_positive = p
+                    elif p.sentiment_value == 'NEGATIVE':
+                        if best_negative is None or p.confidence > best_negative.confidence:
+                            best_negative = p
+                self._extremes_cache = (best_positive, best_negative)
+        return self._extremes_cache
+
+    def _best_for(self, sentiment_code):
+        mask = self._sentiment_codes == sentiment_code
+        if not mask.any():
+            return None
+        return self.products[int(np.where(mask, self._confidences, -1.0).argmax())]
+
+    def most_used_words(self, cnt=10, stop_words=ONE_WORD_CONJUNCTIONS, use_sketch=False):
+        if use_sketch and np is not None:
+            return self._top_words_sketch(cnt, self._normalize_stop_words(stop_words))
+        if np is not None:
+            tokens = self._all_tokens()
+            if len(tokens) >= self.NUMPY_TOP_K_THRESHOLD:
+                stop = self._normalize_stop_words(stop_words)
+                if njit is not None:
+                    return self._top_words_numba(tokens, cnt, stop)
+                return self._top_words_numpy(tokens, cnt, stop)
+        return self._words_statistics(stop_words).most_common(cnt)
+
+    def _all_tokens(self):
+        tokens = []
+        for p in self.products:
+            if p._tokens is None:
+                p._tokens = _tokenize(p.description)
+            tokens.extend(p._tokens)
+        return tokens
+
+    @staticmethod
+    def _top_words_numpy(tokens, cnt, stop_words):
+        toks = np.array(tokens)
+        if stop_words:
+            toks = toks[~np.isin(toks, np.array(sorted(stop_words)))]
+        uniq, counts = np.unique(toks, return_counts=True)
+        if cnt < len(uniq):
+            # argpartition finds the top-k in O(V); only the k survivors get sorted.
+            keep = np.argpartition(-counts, cnt)[:cnt]
+            uniq, counts = uniq[keep], counts[keep]
+        order = np.argsort(-counts)
+        return list(zip(uniq[order].tolist(), counts[order].tolist()))
+
+    @staticmethod
+    def _top_words_numba(tokens, cnt, stop_words):
+        # Intern tokens to small ints in Python, then count inside a compiled
+        # loop; strings themselves never cross into Numba.
+        vocab = {}
+        token_ids = np.empty(len(tokens), np.int32)
+        for i, t in enumerate(tokens):
+            token_id = vocab.get(t)
+            if token_id is None:
+                token_id = len(vocab)
+                vocab[t] = token_id
+            token_ids[i] = token_id
+        stop_mask = np.zeros(len(vocab), np.bool_)
+        for w in stop_words:
+            token_id = vocab.get(w)
+            if token_id is not None:
+                stop_mask[token_id] = True
+        counts = _count_token_ids(token_ids, stop_mask, len(vocab))
+        words = list(vocab)  # insertion order matches the assigned ids
+        keep = np.argpartition(-counts, cnt)[:cnt] if cnt < len(words) else np.arange(len(words))
+        order = keep[np.argsort(-counts[keep])]
+        return [(words[i], int(counts[i])) for i in order]
+
+    def _top_words_sketch(self, cnt, stop_words):
+        # Bounded-memory approximate counts: a fixed hash table of buckets plus
+        # a dict of the words frequent enough to matter for the top-k. Hash
+        # collisions can overcount rare words but not displace heavy hitters.
+        table = np.zeros(self.SKETCH_TABLE_SIZE, np.int32)
+        slot_mask = self.SKETCH_TABLE_SIZE - 1
+        heavy_hitters = {}
+        for p in self.products:
+            if p._tokens is None:
+                p._tokens = _tokenize(p.description)
+            for t in p._tokens:
+                if t in stop_words:
+                    continue
+                slot = hash(t) & slot_mask
+                table[slot] += 1
+                if table[slot] >= self.SKETCH_HEAVY_THRESHOLD:
+                    heavy_hitters[t] = slot
+        return heapq.nlargest(cnt,
+            ((w, int(table[slot])) for w, slot in heavy_hitters.items()),
+            key=lambda ws: ws[1])
+
+    @staticmethod
+    def _normalize_stop_words(stop_words):
+        if stop_words is STOP_WORDS:
+            return stop_words
+        return frozenset(map(str.lower, stop_words))
+
+    def _words_statistics(self, stop_words=ONE_WORD_CONJUNCTIONS):
+        stop = self._normalize_stop_words(stop_words)
+        counter = self._words_cache.get(stop)
+        if counter is None:
+            counter = Counter()
+            for p in self.products:
+                if p._tokens is None:
+                    p._tokens = _tokenize(p.description)
+                counter.update(t for t in p._tokens if t not in stop)
+            self._words_cache[stop] = counter
+        return counter